@@ -6,11 +6,16 @@ Production-ready implementation with secure API key handling and comprehensive e
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, astuple
 from datetime import datetime
 import asyncio
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
 import anthropic
 from dotenv import load_dotenv
@@ -25,6 +30,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Claude model used for every request
+_CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+
+# Strategy analyses persist on disk across runs for a day, outside the working tree
+_ANALYSIS_CACHE_PATH = os.getenv(
+    'FLIGHTPATH_AI_CACHE',
+    os.path.join(tempfile.gettempdir(), 'flightpath_ai_cache.sqlite')
+)
+_ANALYSIS_CACHE_TTL = 86400
+
+# Chat persona, shared verbatim by every chat request
+_CHAT_SYSTEM_PROMPT = """
+You are a helpful flight planning assistant. You can help users with:
+- Flight booking strategies
+- Points and miles optimization
+- Route planning
+- Travel timing advice
+- Budget optimization
+
+Be conversational, helpful, and provide actionable advice.
+"""
+
+# Reply sent in place of a chat answer when the Claude request fails
+CHAT_FALLBACK_RESPONSE = "I'm sorry, I'm having trouble processing your request right now. Please try again."
+
 
 @dataclass
 class FlightRecommendation:
@@ -39,7 +69,7 @@ class FlightRecommendation:
     combined_score: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FlightData:
     """Data class for flight information."""
     origin: str
@@ -65,46 +95,109 @@ class PointsOptimizer:
     
     def calculate_points_value(self, flight_data: FlightData) -> Dict[str, Any]:
         """Calculate points value using rule-based logic."""
-        base_points = 10000
+        result = _points_value(flight_data.class_preference, flight_data.destination)
+        # Copy so callers can't mutate the cached entry
+        return {**result, "factors": dict(result["factors"])}
+    
+    def get_alternative_routes(self, flight_data: FlightData) -> List[Dict[str, Any]]:
+        """Get alternative routes for optimization."""
+        return [dict(alt) for alt in _alternative_routes(flight_data.origin, flight_data.destination)]
+
+
+# Points multiplier per travel class; unlisted classes earn the base rate
+_CLASS_POINTS_MULTIPLIERS = {"business": 2, "first": 3}
+
+
+@lru_cache(maxsize=512)
+def _points_value(class_preference: str, destination: str) -> Dict[str, Any]:
+    """Rule-based points calculation, memoized on the fields it reads."""
+    # Apply rule-based calculations
+    class_multiplier = _CLASS_POINTS_MULTIPLIERS.get(class_preference, 1)
+    base_points = 10000 * class_multiplier
         
-        # Apply rule-based calculations
-        if flight_data.class_preference == "business":
-            base_points *= 2
-        elif flight_data.class_preference == "first":
-            base_points *= 3
-            
-        # Distance-based calculation (mock)
-        distance_multiplier = 1.0
-        if "international" in flight_data.destination.lower():
-            distance_multiplier = 2.0
-            
-        total_points = int(base_points * distance_multiplier)
+    # Distance-based calculation (mock)
+    distance_multiplier = 1.0
+    if "international" in destination.lower():
+        distance_multiplier = 2.0
         
-        return {
-            "points_required": total_points,
-            "rule_based_score": min(total_points / 50000, 1.0),
-            "factors": {
-                "class_multiplier": 2 if flight_data.class_preference == "business" else 1,
-                "distance_multiplier": distance_multiplier,
-                "base_points": base_points
-            }
+    total_points = int(base_points * distance_multiplier)
+    
+    return {
+        "points_required": total_points,
+        "rule_based_score": min(total_points / 50000, 1.0),
+        "factors": {
+            "class_multiplier": class_multiplier,
+            "distance_multiplier": distance_multiplier,
+            "base_points": base_points
+        }
+    }
+
+
+@lru_cache(maxsize=512)
+def _alternative_routes(origin: str, destination: str) -> Tuple[Dict[str, Any], ...]:
+    """Alternative routes for an origin/destination pair, memoized."""
+    return (
+        {
+            "route": f"{origin} -> {destination}",
+            "points_value": 15000,
+            "savings": 5000
+        },
+        {
+            "route": f"{origin} -> Hub -> {destination}",
+            "points_value": 12000,
+            "savings": 8000
         }
+    )
+
+
+class AnalysisCache:
+    """SQLite-backed cache of strategy analyses that survives across runs.
     
-    def get_alternative_routes(self, flight_data: FlightData) -> List[Dict[str, Any]]:
-        """Get alternative routes for optimization."""
-        alternatives = [
-            {
-                "route": f"{flight_data.origin} -> {flight_data.destination}",
-                "points_value": 15000,
-                "savings": 5000
-            },
-            {
-                "route": f"{flight_data.origin} -> Hub -> {flight_data.destination}",
-                "points_value": 12000,
-                "savings": 8000
-            }
-        ]
-        return alternatives
+    The cache is optional: any SQLite error is logged and treated as a miss.
+    """
+    
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, created REAL, value TEXT)"
+                )
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache disabled, cannot open {path}: {e}")
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for key, or None if missing or expired."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT created, value FROM analyses WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache read failed: {e}")
+            return None
+        if row is None or time.time() - row[0] >= self.ttl:
+            return None
+        return json.loads(row[1])
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store an analysis under key."""
+        if self._conn is None:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)",
+                    (key, time.time(), json.dumps(value))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache write failed: {e}")
 
 
 class AIFlightPath:
@@ -115,8 +208,10 @@ class AIFlightPath:
     
     def __init__(self):
         self.client = None
+        self.async_client = None
         self.points_optimizer = PointsOptimizer()
         self.conversation_history = []
+        self.analysis_cache = AnalysisCache(_ANALYSIS_CACHE_PATH, _ANALYSIS_CACHE_TTL)
         self._initialize_client()
     
     def _initialize_client(self):
@@ -130,6 +225,8 @@ class AIFlightPath:
                 )
             
             self.client = anthropic.Anthropic(api_key=api_key)
+            # Async client for streaming responses
+            self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
             logger.info("Successfully initialized Anthropic client")
             
         except Exception as e:
@@ -168,6 +265,12 @@ class AIFlightPath:
         Send flight data to Claude API for strategic analysis.
         """
         async with self._error_handler("flight strategy analysis"):
+            # Analyses are deterministic per flight and model, so reuse earlier runs
+            cache_key = json.dumps([_CLAUDE_MODEL, *astuple(flight_data)])
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             context = self._prepare_flight_context(flight_data)
             
             system_prompt = """
@@ -189,10 +292,11 @@ class AIFlightPath:
             """
             
             try:
-                response = self.client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
+                response = await asyncio.to_thread(
+                    self.client.messages.create,
+                    model=_CLAUDE_MODEL,
                     max_tokens=1000,
-                    temperature=0.3,
+                    temperature=0.0,
                     system=system_prompt,
                     messages=[{"role": "user", "content": user_prompt}]
                 )
@@ -202,7 +306,7 @@ class AIFlightPath:
                 # Parse AI confidence (simplified extraction)
                 confidence = self._extract_confidence_score(ai_analysis)
                 
-                return {
+                result = {
                     "ai_analysis": ai_analysis,
                     "confidence": confidence,
                     "ai_score": confidence,
@@ -218,6 +322,10 @@ class AIFlightPath:
                     "timestamp": datetime.now().isoformat(),
                     "error": str(e)
                 }
+            
+            # Cache only successful analyses, outside the API error handling
+            self.analysis_cache.set(cache_key, result)
+            return result
     
     def _extract_confidence_score(self, ai_text: str) -> float:
         """Extract confidence score from AI response."""
@@ -294,43 +402,48 @@ class AIFlightPath:
             logger.error(f"Error generating flight recommendations: {e}")
             raise
     
+    def _prepare_chat_request(self, user_message: str,
+                              flight_context: Optional[FlightData]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """Build the system prompt and messages for a chat request."""
+        # Persona and flight context form an identical prefix across questions,
+        # so they go in a cacheable system block and the question stays last
+        system_text = _CHAT_SYSTEM_PROMPT
+        if flight_context:
+            system_text += f"\nFlight context: {self._prepare_flight_context(flight_context)}"
+        
+        system_prompt = [{
+            "type": "text",
+            "text": system_text,
+            "cache_control": {"type": "ephemeral"}
+        }]
+        messages = [{"role": "user", "content": user_message}]
+        
+        return system_prompt, messages
+    
+    def _record_chat_turn(self, user_message: str, assistant_response: Optional[str] = None):
+        """Append a chat exchange to the conversation history as one turn."""
+        # Recording both messages together keeps concurrent chats from interleaving
+        self.conversation_history.append({"role": "user", "content": user_message})
+        if assistant_response is None:
+            return
+        self.conversation_history.append({"role": "assistant", "content": assistant_response})
+        
+        # Keep conversation history manageable
+        if len(self.conversation_history) > 20:
+            self.conversation_history = self.conversation_history[-20:]
+    
     async def interactive_chat(self, user_message: str, flight_context: Optional[FlightData] = None) -> str:
         """
         Interactive chat functionality for flight planning assistance.
         """
         async with self._error_handler("interactive chat"):
-            # Add user message to conversation history
-            self.conversation_history.append({"role": "user", "content": user_message})
-            
-            # Prepare context
-            context = ""
-            if flight_context:
-                context = self._prepare_flight_context(flight_context)
-            
-            system_prompt = """
-            You are a helpful flight planning assistant. You can help users with:
-            - Flight booking strategies
-            - Points and miles optimization
-            - Route planning
-            - Travel timing advice
-            - Budget optimization
-            
-            Be conversational, helpful, and provide actionable advice.
-            """
-            
-            # Prepare messages for the API
-            messages = []
-            if context:
-                messages.append({
-                    "role": "user", 
-                    "content": f"Flight context: {context}\n\nUser question: {user_message}"
-                })
-            else:
-                messages.append({"role": "user", "content": user_message})
+            system_prompt, messages = self._prepare_chat_request(user_message, flight_context)
             
             try:
-                response = self.client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
+                # Run the blocking client call off the event loop so concurrent chats overlap
+                response = await asyncio.to_thread(
+                    self.client.messages.create,
+                    model=_CLAUDE_MODEL,
                     max_tokens=800,
                     temperature=0.5,
                     system=system_prompt,
@@ -338,19 +451,42 @@ class AIFlightPath:
                 )
                 
                 assistant_response = response.content[0].text
-                
-                # Add assistant response to conversation history
-                self.conversation_history.append({"role": "assistant", "content": assistant_response})
-                
-                # Keep conversation history manageable
-                if len(self.conversation_history) > 20:
-                    self.conversation_history = self.conversation_history[-20:]
+                self._record_chat_turn(user_message, assistant_response)
                 
                 return assistant_response
                 
             except Exception as e:
                 logger.error(f"Error in interactive chat: {e}")
-                return "I'm sorry, I'm having trouble processing your request right now. Please try again."
+                self._record_chat_turn(user_message)
+                return CHAT_FALLBACK_RESPONSE
+    
+    async def interactive_chat_stream(self, user_message: str,
+                                      flight_context: Optional[FlightData] = None) -> AsyncIterator[str]:
+        """
+        Streaming variant of interactive_chat that yields response text as it arrives.
+        """
+        async with self._error_handler("interactive chat stream"):
+            system_prompt, messages = self._prepare_chat_request(user_message, flight_context)
+            
+            chunks = []
+            try:
+                async with self.async_client.messages.stream(
+                    model=_CLAUDE_MODEL,
+                    max_tokens=800,
+                    temperature=0.5,
+                    system=system_prompt,
+                    messages=messages
+                ) as stream:
+                    async for text in stream.text_stream:
+                        chunks.append(text)
+                        yield text
+                
+                self._record_chat_turn(user_message, "".join(chunks))
+                
+            except Exception as e:
+                logger.error(f"Error in interactive chat stream: {e}")
+                self._record_chat_turn(user_message)
+                yield CHAT_FALLBACK_RESPONSE
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get the current conversation history."""
@@ -5,6 +5,7 @@ Provides external and internal context for flight recommendations
 
 import requests
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import logging
@@ -22,6 +23,10 @@ logger = logging.getLogger(__name__)
 # Configure requests cache for API calls
 requests_cache.install_cache('context_cache', expire_after=3600)  # 1 hour cache
 
+# Computed contexts expire on the same schedule as the API cache
+_CONTEXT_CACHE_TTL = 3600
+_CONTEXT_CACHE_SIZE = 256
+
 @dataclass
 class ContextInsight:
     """Data class for context insights"""
@@ -109,6 +114,9 @@ class ContextEngine:
             'ATL': {'peak_hours': [(6, 9), (16, 19)], 'delay_factor': 1.2},
             'DEN': {'peak_hours': [(7, 10), (17, 20)], 'delay_factor': 1.1}
         }
+        
+        # Computed contexts keyed on the request arguments: key -> (created_at, context)
+        self._context_cache: Dict[Tuple, Tuple[float, TravelContext]] = {}
     
     def get_context(self, origin: str, destination: str, departure_date: str, 
                    return_date: Optional[str] = None, 
@@ -117,6 +125,12 @@ class ContextEngine:
         """
         Get comprehensive travel context for a flight request
         """
+        key = (origin, destination, departure_date, return_date, passenger_count, class_preference)
+        now = time.monotonic()
+        cached = self._context_cache.get(key)
+        if cached is not None and now - cached[0] < _CONTEXT_CACHE_TTL:
+            return cached[1]
+        
         try:
             logger.info(f"Getting context for {origin} to {destination} on {departure_date}")
             
@@ -146,7 +160,7 @@ class ContextEngine:
             # Calculate overall confidence
             confidence = self._calculate_context_confidence(external_context, internal_context)
             
-            return TravelContext(
+            context = TravelContext(
                 external_context=external_context,
                 internal_context=internal_context,
                 insights=insights,
@@ -155,6 +169,14 @@ class ContextEngine:
                 confidence=confidence
             )
             
+            # Re-insert so the oldest entry is always evicted first
+            self._context_cache.pop(key, None)
+            if len(self._context_cache) >= _CONTEXT_CACHE_SIZE:
+                self._context_cache.pop(next(iter(self._context_cache)), None)
+            self._context_cache[key] = (now, context)
+            
+            return context
+            
         except Exception as e:
             logger.error(f"Error getting context: {e}")
             return self._get_default_context()
@@ -8,6 +8,7 @@ import asyncio
 import json
 import logging
 from datetime import datetime
+import orjson
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 import sys
@@ -22,7 +23,7 @@ sys.path.append(parent_dir)
 from ai_flightpath import AIFlightPath, FlightData
 from nlp_parser import FlightQueryParser
 from context_engine import ContextEngine
-from trip_orchestration_integration import TripOrchestrationIntegration
+from trip_orchestration_integration import get_integration
 
 app = Flask(__name__)
 CORS(app)
@@ -55,7 +56,7 @@ def initialize_systems():
         logger.info("✅ Context Engine initialized")
         
         # Initialize Trip Orchestration
-        trip_orchestration = TripOrchestrationIntegration()
+        trip_orchestration = get_integration()
         logger.info("✅ Trip Orchestration system initialized")
         
         return True
@@ -400,67 +401,13 @@ def orchestrate_trip():
             )
             
             # Convert result to JSON-serializable format
-            orchestration_result = {
-                'trip_id': result.trip_id,
-                'original_query': result.original_query,
-                'parsed_request': result.parsed_request,
-                'budget_optimization': {
-                    'optimized_budget': {k: float(v) for k, v in result.budget_optimization['optimized_budget'].items()},
-                    'total_cost': result.budget_optimization['total_cost'],
-                    'savings': result.budget_optimization['savings'],
-                    'efficiency_score': result.budget_optimization['efficiency_score'],
-                    'recommendations': result.budget_optimization['recommendations'],
-                    'warnings': result.budget_optimization['warnings']
-                },
-                'orchestration_result': {
-                    'trip_id': result.orchestration_result.trip_id,
-                    'segments': [
-                        {
-                            'origin': seg.origin,
-                            'destination': seg.destination,
-                            'start_date': seg.start_date,
-                            'end_date': seg.end_date,
-                            'accommodation_type': seg.accommodation_type.value,
-                            'transportation_mode': seg.transportation_mode.value
-                        }
-                        for seg in result.orchestration_result.segments
-                    ],
-                    'activities': [
-                        {
-                            'name': act.name,
-                            'date': act.date,
-                            'duration_hours': act.duration_hours,
-                            'cost': float(act.cost),
-                            'category': act.category,
-                            'booking_required': act.booking_required
-                        }
-                        for act in result.orchestration_result.activities
-                    ],
-                    'special_requirements': [
-                        {
-                            'type': req.type.value,
-                            'description': req.description,
-                            'cost_impact': float(req.cost_impact),
-                            'handled': req.handled
-                        }
-                        for req in result.orchestration_result.special_requirements
-                    ],
-                    'cost_breakdown': {k: float(v) for k, v in result.orchestration_result.cost_breakdown.items()},
-                    'optimization_score': result.orchestration_result.optimization_score,
-                    'tax_savings': float(result.orchestration_result.tax_savings)
-                },
-                'daily_schedule': result.daily_schedule,
-                'booking_checklist': result.booking_checklist,
-                'total_cost': float(result.total_cost),
-                'tax_savings': float(result.tax_savings),
-                'efficiency_score': result.efficiency_score,
-                'confidence_score': result.confidence_score
-            }
+            orchestration_result = result.to_dict()
             
-            return jsonify({
-                'success': True,
-                'result': orchestration_result
-            })
+            # Serialize with orjson; default=str covers Decimal values in the parsed request
+            return app.response_class(
+                orjson.dumps({'success': True, 'result': orchestration_result}, default=str),
+                mimetype='application/json'
+            )
             
         finally:
             loop.close()
@@ -139,7 +139,32 @@ class FlightQueryParser:
             # Process with spaCy
             doc = self.nlp(normalized_query)
             
-            # Extract structured components
+        except Exception as e:
+            logger.error(f"Error parsing query: {e}")
+            return self._get_default_result()
+        
+        return self._parse_doc(doc, normalized_query)
+    
+    def parse_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse several queries at once, running spaCy over them as a single batch
+        """
+        try:
+            logger.info(f"Parsing batch of {len(queries)} queries")
+            
+            normalized_queries = [self._normalize_query(query) for query in queries]
+            docs = list(self.nlp.pipe(normalized_queries))
+            
+        except Exception as e:
+            logger.error(f"Error parsing query batch: {e}")
+            return [self._get_default_result() for _ in queries]
+        
+        return [self._parse_doc(doc, normalized_query)
+                for doc, normalized_query in zip(docs, normalized_queries)]
+    
+    def _parse_doc(self, doc, normalized_query: str) -> Dict[str, Any]:
+        """Extract structured components from a processed query"""
+        try:
             result = {
                 'origin': self._extract_origin(doc, normalized_query),
                 'destination': self._extract_destination(doc, normalized_query),
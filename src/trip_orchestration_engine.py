@@ -6,11 +6,14 @@ Handles complex multi-component trips with budget optimization and constraint ha
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import re
+from collections import defaultdict
+from functools import lru_cache
 from decimal import Decimal, ROUND_HALF_UP
 import decimal
 
@@ -18,6 +21,16 @@ import decimal
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default budget split: flights, accommodation, activities, food, transport, contingency
+_DEFAULT_ALLOCATION_RATIOS = (
+    Decimal('0.35'),  # 35% for flights
+    Decimal('0.30'),  # 30% for accommodation
+    Decimal('0.15'),  # 15% for activities
+    Decimal('0.15'),  # 15% for food
+    Decimal('0.03'),  # 3% for local transport
+    Decimal('0.02'),  # 2% contingency
+)
+
 class TripType(Enum):
     """Trip type enumeration"""
     FAMILY_VACATION = "family_vacation"
@@ -46,7 +59,19 @@ class RequirementType(Enum):
     CONFERENCE = "conference"
     TAX_DEDUCTION = "tax_deduction"
 
-@dataclass
+# Cost breakdown keys for the activity categories and requirement types the engine produces
+_ACTIVITY_CATEGORY_KEYS = {
+    category: f"activity_{category}"
+    for category in ('theme_park', 'dining', 'conference', 'business_meal', 'transport')
+}
+_REQUIREMENT_KEYS = {req_type: f"requirement_{req_type.value}" for req_type in RequirementType}
+
+@lru_cache(maxsize=4096)
+def parse_ymd(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD segment date by slicing, skipping strptime's format machinery"""
+    return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+
+@dataclass(slots=True)
 class TripBudget:
     """Trip budget breakdown"""
     total_budget: Decimal
@@ -61,20 +86,20 @@ class TripBudget:
     
     def __post_init__(self):
         """Calculate budget allocations if not specified"""
-        if all(getattr(self, field.name) == Decimal('0') for field in self.__dataclass_fields__.values() 
-               if field.name != 'total_budget'):
+        if not (self.flights_budget or self.accommodation_budget or self.activities_budget or
+                self.food_budget or self.transport_budget or self.pet_budget or
+                self.business_budget or self.contingency_budget):
             self._calculate_default_allocations()
     
     def _calculate_default_allocations(self):
         """Calculate default budget allocations"""
-        self.flights_budget = self.total_budget * Decimal('0.35')  # 35% for flights
-        self.accommodation_budget = self.total_budget * Decimal('0.30')  # 30% for accommodation
-        self.activities_budget = self.total_budget * Decimal('0.15')  # 15% for activities
-        self.food_budget = self.total_budget * Decimal('0.15')  # 15% for food
-        self.transport_budget = self.total_budget * Decimal('0.03')  # 3% for local transport
-        self.contingency_budget = self.total_budget * Decimal('0.02')  # 2% contingency
+        total = self.total_budget
+        (self.flights_budget, self.accommodation_budget, self.activities_budget,
+         self.food_budget, self.transport_budget, self.contingency_budget) = (
+            total * ratio for ratio in _DEFAULT_ALLOCATION_RATIOS
+        )
 
-@dataclass
+@dataclass(slots=True)
 class TripSegment:
     """Individual trip segment"""
     origin: str
@@ -87,7 +112,7 @@ class TripSegment:
     budget_allocation: Decimal
     is_business: bool = False
     
-@dataclass
+@dataclass(slots=True)
 class SpecialRequirement:
     """Special requirement for the trip"""
     type: RequirementType
@@ -96,7 +121,7 @@ class SpecialRequirement:
     logistics: Dict[str, Any] = None
     business_deductible: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class Activity:
     """Trip activity"""
     name: str
@@ -108,7 +133,7 @@ class Activity:
     is_business: bool = False
     booking_required: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class TripItinerary:
     """Complete trip itinerary"""
     trip_id: str
@@ -153,6 +178,13 @@ class TripOrchestrationEngine:
             }
         }
         
+        # Nightly rate used when costing segments (host gift for family hosting)
+        self._nightly_accommodation_costs = {
+            accommodation_type: (costs['luxury'] if accommodation_type == AccommodationType.FAMILY_HOSTING
+                                 else costs['mid_range'])
+            for accommodation_type, costs in self.accommodation_costs.items()
+        }
+        
         # Activity cost data
         self.activity_costs = {
             'theme_park': {'adult': Decimal('120'), 'child': Decimal('100')},
@@ -180,6 +212,7 @@ class TripOrchestrationEngine:
             'conference': 1.0,  # 100% deductible
             'entertainment': 0.5  # 50% deductible
         }
+        self._tax_rates_d = {k: Decimal(str(v)) for k, v in self.tax_rates.items()}
     
     async def orchestrate_trip(self, parsed_request: Dict[str, Any]) -> TripItinerary:
         """
@@ -208,7 +241,7 @@ class TripOrchestrationEngine:
             
             # Calculate business deductions
             tax_savings, business_percentage = self._calculate_tax_benefits(
-                activities, requirements, optimized_budget
+                activities, requirements, optimized_budget, segments
             )
             
             # Generate final cost breakdown
@@ -223,7 +256,7 @@ class TripOrchestrationEngine:
             
             # Create itinerary
             itinerary = TripItinerary(
-                trip_id=f"trip_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                trip_id=f"trip_{time.time_ns():x}",
                 trip_type=trip_type,
                 total_duration_days=self._calculate_duration(segments),
                 segments=segments,
@@ -275,10 +308,15 @@ class TripOrchestrationEngine:
         budget_value = parsed_request.get('budget', 4000)
         if budget_value is None:
             budget_value = 6000  # Default for complex trips without specified budget
-        try:
-            total_budget = Decimal(str(budget_value))
-        except (TypeError, ValueError, decimal.InvalidOperation):
-            total_budget = Decimal('6000')  # Safe default
+        if isinstance(budget_value, Decimal):
+            total_budget = budget_value
+        elif type(budget_value) is int:
+            total_budget = Decimal(budget_value)
+        else:
+            try:
+                total_budget = Decimal(str(budget_value))
+            except (TypeError, ValueError, decimal.InvalidOperation):
+                total_budget = Decimal('6000')  # Safe default
         
         budget = TripBudget(total_budget=total_budget)
         
@@ -383,6 +421,7 @@ class TripOrchestrationEngine:
     def _determine_segment_requirements(self, parsed_request: Dict[str, Any], destination: str) -> List[RequirementType]:
         """Determine requirements for a segment"""
         requirements = []
+        request_text = parsed_request.get('original_query', '').lower()
         
         if parsed_request.get('has_pets', False):
             requirements.append(RequirementType.PET_TRAVEL)
@@ -391,10 +430,10 @@ class TripOrchestrationEngine:
             requirements.append(RequirementType.BUSINESS_EVENT)
             requirements.append(RequirementType.TAX_DEDUCTION)
         
-        if 'sister hosting' in parsed_request.get('original_query', '').lower():
+        if 'sister hosting' in request_text:
             requirements.append(RequirementType.FAMILY_HOSTING)
         
-        if 'conference' in parsed_request.get('original_query', '').lower():
+        if 'conference' in request_text:
             requirements.append(RequirementType.CONFERENCE)
         
         return requirements
@@ -411,35 +450,31 @@ class TripOrchestrationEngine:
         activities = []
         
         for segment in segments:
-            segment_activities = self._plan_segment_activities(segment, parsed_request, budget)
-            activities.extend(segment_activities)
+            self._plan_segment_activities(segment, parsed_request, budget, activities)
         
         return activities
     
-    def _plan_segment_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], budget: TripBudget) -> List[Activity]:
-        """Plan activities for a specific segment"""
-        activities = []
-        segment_days = (datetime.strptime(segment.end_date, '%Y-%m-%d') - 
-                       datetime.strptime(segment.start_date, '%Y-%m-%d')).days + 1
+    def _plan_segment_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], budget: TripBudget,
+                                 activities: List[Activity]) -> None:
+        """Plan activities for a specific segment, appending them to activities"""
+        segment_days = (parse_ymd(segment.end_date) - parse_ymd(segment.start_date)).days + 1
         
         daily_activity_budget = budget.activities_budget / len(parsed_request.get('destinations', [segment.destination])) / segment_days
         
         # Theme park activities (Disneyland)
         if 'disneyland' in segment.destination.lower():
-            activities.extend(self._plan_theme_park_activities(segment, parsed_request, daily_activity_budget))
+            self._plan_theme_park_activities(segment, parsed_request, daily_activity_budget, activities)
         
         # Business activities
         if segment.is_business:
-            activities.extend(self._plan_business_activities(segment, parsed_request, daily_activity_budget))
+            self._plan_business_activities(segment, parsed_request, daily_activity_budget, activities)
         
         # General leisure activities
-        activities.extend(self._plan_leisure_activities(segment, parsed_request, daily_activity_budget))
-        
-        return activities
+        self._plan_leisure_activities(segment, parsed_request, daily_activity_budget, activities)
     
-    def _plan_theme_park_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], daily_budget: Decimal) -> List[Activity]:
-        """Plan theme park activities"""
-        activities = []
+    def _plan_theme_park_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], daily_budget: Decimal,
+                                    activities: List[Activity]) -> None:
+        """Plan theme park activities, appending them to activities"""
         passenger_count = parsed_request.get('passenger_count', 4)
         adult_count = max(2, passenger_count - 2)  # Assume 2 adults minimum
         child_count = passenger_count - adult_count
@@ -469,13 +504,10 @@ class TripOrchestrationEngine:
             category="dining",
             booking_required=True
         ))
-        
-        return activities
     
-    def _plan_business_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], daily_budget: Decimal) -> List[Activity]:
-        """Plan business activities"""
-        activities = []
-        
+    def _plan_business_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], daily_budget: Decimal,
+                                  activities: List[Activity]) -> None:
+        """Plan business activities, appending them to activities"""
         # Conference registration
         if RequirementType.CONFERENCE in segment.requirements:
             activities.append(Activity(
@@ -499,16 +531,12 @@ class TripOrchestrationEngine:
             category="business_meal",
             is_business=True
         ))
-        
-        return activities
     
-    def _plan_leisure_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], daily_budget: Decimal) -> List[Activity]:
-        """Plan general leisure activities"""
-        activities = []
-        
+    def _plan_leisure_activities(self, segment: TripSegment, parsed_request: Dict[str, Any], daily_budget: Decimal,
+                                 activities: List[Activity]) -> None:
+        """Plan general leisure activities, appending them to activities"""
         # Local transportation
-        segment_days = (datetime.strptime(segment.end_date, '%Y-%m-%d') - 
-                       datetime.strptime(segment.start_date, '%Y-%m-%d')).days + 1
+        segment_days = (parse_ymd(segment.end_date) - parse_ymd(segment.start_date)).days + 1
         
         if segment.accommodation_type != AccommodationType.FAMILY_HOSTING:
             transport_cost = segment_days * self.activity_costs['transport_rental']['daily']
@@ -520,8 +548,6 @@ class TripOrchestrationEngine:
                 duration_hours=24 * segment_days,
                 category="transport"
             ))
-        
-        return activities
     
     def _handle_requirements(self, parsed_request: Dict[str, Any]) -> List[SpecialRequirement]:
         """Handle special requirements"""
@@ -582,14 +608,9 @@ class TripOrchestrationEngine:
         # Calculate accommodation costs
         total_accommodation_cost = Decimal('0')
         for segment in segments:
-            segment_days = (datetime.strptime(segment.end_date, '%Y-%m-%d') - 
-                           datetime.strptime(segment.start_date, '%Y-%m-%d')).days + 1
-            
-            if segment.accommodation_type == AccommodationType.FAMILY_HOSTING:
-                cost_per_night = self.accommodation_costs[segment.accommodation_type]['luxury']
-            else:
-                cost_per_night = self.accommodation_costs[segment.accommodation_type]['mid_range']
+            segment_days = (parse_ymd(segment.end_date) - parse_ymd(segment.start_date)).days + 1
             
+            cost_per_night = self._nightly_accommodation_costs[segment.accommodation_type]
             total_accommodation_cost += cost_per_night * segment_days
         
         # Adjust budget allocations
@@ -619,7 +640,7 @@ class TripOrchestrationEngine:
         return budget
     
     def _calculate_tax_benefits(self, activities: List[Activity], requirements: List[SpecialRequirement], 
-                               budget: TripBudget) -> Tuple[Decimal, float]:
+                               budget: TripBudget, segments: List[TripSegment]) -> Tuple[Decimal, float]:
         """Calculate tax benefits for business portions"""
         total_business_cost = Decimal('0')
         total_deductible = Decimal('0')
@@ -628,24 +649,24 @@ class TripOrchestrationEngine:
         for activity in activities:
             if activity.is_business:
                 if activity.category == 'conference':
-                    deductible = activity.cost * Decimal(str(self.tax_rates['conference']))
+                    deductible = activity.cost * self._tax_rates_d['conference']
                 elif activity.category == 'business_meal':
-                    deductible = activity.cost * Decimal(str(self.tax_rates['meals']))
+                    deductible = activity.cost * self._tax_rates_d['meals']
                 else:
-                    deductible = activity.cost * Decimal(str(self.tax_rates['transport']))
+                    deductible = activity.cost * self._tax_rates_d['transport']
                 
                 total_business_cost += activity.cost
                 total_deductible += deductible
         
         # Business portion of accommodation and transport
-        business_segments = sum(1 for segment in [] if segment.is_business)  # This would be calculated from segments
+        business_segments = sum(1 for segment in segments if segment.is_business)
         if business_segments > 0:
             business_accommodation = budget.accommodation_budget * Decimal('0.5')  # Assume 50% business
             business_transport = budget.transport_budget * Decimal('0.5')
             
             total_business_cost += business_accommodation + business_transport
-            total_deductible += (business_accommodation * Decimal(str(self.tax_rates['accommodation'])) + 
-                               business_transport * Decimal(str(self.tax_rates['transport'])))
+            total_deductible += (business_accommodation * self._tax_rates_d['accommodation'] + 
+                               business_transport * self._tax_rates_d['transport'])
         
         # Calculate tax savings (assuming 25% tax rate)
         tax_savings = total_deductible * Decimal('0.25')
@@ -658,7 +679,7 @@ class TripOrchestrationEngine:
     def _generate_cost_breakdown(self, budget: TripBudget, segments: List[TripSegment], 
                                 activities: List[Activity], requirements: List[SpecialRequirement]) -> Dict[str, Decimal]:
         """Generate detailed cost breakdown"""
-        breakdown = {
+        breakdown = defaultdict(Decimal, {
             'flights': budget.flights_budget,
             'accommodation': budget.accommodation_budget,
             'activities': budget.activities_budget,
@@ -667,21 +688,19 @@ class TripOrchestrationEngine:
             'pet_costs': budget.pet_budget,
             'business_expenses': budget.business_budget,
             'contingency': budget.contingency_budget
-        }
+        })
         
         # Add specific activity costs
         for activity in activities:
-            category = f"activity_{activity.category}"
-            if category not in breakdown:
-                breakdown[category] = Decimal('0')
+            category = _ACTIVITY_CATEGORY_KEYS.get(activity.category) or f"activity_{activity.category}"
             breakdown[category] += activity.cost
         
         # Add requirement costs
         for requirement in requirements:
-            req_category = f"requirement_{requirement.type.value}"
+            req_category = _REQUIREMENT_KEYS[requirement.type]
             breakdown[req_category] = requirement.cost_impact
         
-        return breakdown
+        return dict(breakdown)
     
     def _calculate_optimization_score(self, parsed_request: Dict[str, Any], 
                                     budget: TripBudget, cost_breakdown: Dict[str, Decimal]) -> float:
@@ -730,10 +749,16 @@ class TripOrchestrationEngine:
         if not segments:
             return 0
         
-        start_date = min(datetime.strptime(segment.start_date, '%Y-%m-%d') for segment in segments)
-        end_date = max(datetime.strptime(segment.end_date, '%Y-%m-%d') for segment in segments)
-        
-        return (end_date - start_date).days + 1
+        start_ordinal = end_ordinal = None
+        for segment in segments:
+            segment_start = parse_ymd(segment.start_date).toordinal()
+            segment_end = parse_ymd(segment.end_date).toordinal()
+            if start_ordinal is None or segment_start < start_ordinal:
+                start_ordinal = segment_start
+            if end_ordinal is None or segment_end > end_ordinal:
+                end_ordinal = segment_end
+        
+        return end_ordinal - start_ordinal + 1
 
 
 # Example usage and testing
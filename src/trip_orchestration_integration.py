@@ -6,22 +6,116 @@ Integrates all components: NLP parsing, budget optimization, and itinerary gener
 import asyncio
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from typing import ClassVar, Dict, Iterable, List, Mapping, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import decimal
 
 # Import our modules
 from trip_nlp_parser import TripNLPParser
 from trip_budget_optimizer import TripBudgetOptimizer, OptimizationStrategy, BudgetConstraint, BudgetCategory
-from trip_orchestration_engine import TripOrchestrationEngine, TripItinerary
+from trip_orchestration_engine import TripOrchestrationEngine, TripItinerary, parse_ymd
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Accommodation booking platforms and their features
+_ACCOMMODATION_PLATFORMS = {
+    'airbnb': {
+        'best_for': ['families', 'extended_stays', 'kitchen_access'],
+        'avg_savings': 0.25,
+        'pet_friendly_filter': True,
+        'cancellation_flexible': True
+    },
+    'hotels.com': {
+        'best_for': ['business', 'loyalty_points', 'consistency'],
+        'avg_savings': 0.10,
+        'pet_friendly_filter': True,
+        'cancellation_flexible': False
+    },
+    'booking.com': {
+        'best_for': ['variety', 'international', 'last_minute'],
+        'avg_savings': 0.15,
+        'pet_friendly_filter': True,
+        'cancellation_flexible': True
+    }
+}
+
+# Activity booking platforms
+_ACTIVITY_PLATFORMS = {
+    'viator': {'best_for': ['tours', 'experiences'], 'discount_rate': 0.05},
+    'getyourguide': {'best_for': ['attractions', 'skip_the_line'], 'discount_rate': 0.08},
+    'klook': {'best_for': ['asia_pacific', 'theme_parks'], 'discount_rate': 0.12},
+    'direct_booking': {'best_for': ['theme_parks', 'museums'], 'discount_rate': 0.00}
+}
+
+# Weekday names indexed by date.weekday()
+_DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Maximum number of budget optimization results kept per integration instance
+_BUDGET_CACHE_SIZE = 512
+
+def _freeze(value: Any) -> Any:
+    """Convert nested dicts and lists into hashable tuples for use in cache keys"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _log_errors(message: str):
+    """Log and re-raise exceptions from an async method, keeping handler setup out of its frame"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logger.error("%s: %s", message, e)
+                raise
+        return wrapper
+    return decorator
+
+# Fixed booking checklist items
+_PET_CHECKLIST = (
+    "🐕 Schedule vet visit for health certificate (2-3 weeks before travel)",
+    "🐕 Purchase airline-approved pet carrier",
+    "🐕 Book pet-friendly accommodations",
+    "🐕 Research pet daycare options at destination",
+    "🐕 Purchase pet travel insurance"
+)
+_BUSINESS_CHECKLIST = (
+    "💼 Set up expense tracking app/spreadsheet",
+    "💼 Confirm business meeting/conference details",
+    "💼 Download receipt scanning app",
+    "💼 Review company travel policy"
+)
+_GENERAL_CHECKLIST = (
+    "📱 Download airline apps",
+    "📱 Download accommodation apps",
+    "💳 Notify credit card companies of travel",
+    "🧳 Check baggage allowances",
+    "📋 Create packing checklist",
+    "🌐 Check international roaming/SIM options",
+    "💉 Check vaccination requirements (if international)"
+)
+_FAMILY_CHECKLIST = (
+    "👨‍👩‍👧‍👦 Prepare travel entertainment for family",
+    "👨‍👩‍👧‍👦 Pack snacks and travel essentials",
+    "👨‍👩‍👧‍👦 Confirm child policies for activities"
+)
+
+def _daily_cost_kernel(accommodation_cost: float, activity_costs: Iterable[float], meal_costs: Iterable[float],
+                       transport_cost: float, pet_daily_cost: float) -> float:
+    """Sum one day's costs using plain float arithmetic"""
+    return accommodation_cost + sum(activity_costs) + sum(meal_costs) + transport_cost + pet_daily_cost
+
+@dataclass(slots=True, frozen=True)
 class CompleteItinerary:
     """Complete trip itinerary with all components"""
     trip_id: str
@@ -35,101 +129,168 @@ class CompleteItinerary:
     tax_savings: Decimal
     efficiency_score: float
     confidence_score: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a JSON-ready dict without the recursive deep copy done by asdict"""
+        orchestration = self.orchestration_result
+        return {
+            'trip_id': self.trip_id,
+            'original_query': self.original_query,
+            'parsed_request': self.parsed_request,
+            'budget_optimization': {
+                'optimized_budget': {k: float(v) for k, v in self.budget_optimization['optimized_budget'].items()},
+                'total_cost': self.budget_optimization['total_cost'],
+                'savings': self.budget_optimization['savings'],
+                'efficiency_score': self.budget_optimization['efficiency_score'],
+                'recommendations': self.budget_optimization['recommendations'],
+                'warnings': self.budget_optimization['warnings']
+            },
+            'orchestration_result': {
+                'trip_id': orchestration.trip_id,
+                'segments': [
+                    {
+                        'origin': seg.origin,
+                        'destination': seg.destination,
+                        'start_date': seg.start_date,
+                        'end_date': seg.end_date,
+                        'accommodation_type': seg.accommodation_type.value,
+                        'purpose': seg.purpose,
+                        'is_business': seg.is_business
+                    }
+                    for seg in orchestration.segments
+                ],
+                'activities': [
+                    {
+                        'name': act.name,
+                        'date': act.date,
+                        'duration_hours': act.duration_hours,
+                        'cost': float(act.cost),
+                        'category': act.category,
+                        'booking_required': act.booking_required
+                    }
+                    for act in orchestration.activities
+                ],
+                'special_requirements': [
+                    {
+                        'type': req.type.value,
+                        'description': req.description,
+                        'cost_impact': float(req.cost_impact),
+                        'business_deductible': req.business_deductible
+                    }
+                    for req in orchestration.requirements
+                ],
+                'cost_breakdown': {k: float(v) for k, v in orchestration.cost_breakdown.items()},
+                'optimization_score': orchestration.optimization_score,
+                'tax_savings': float(orchestration.tax_savings)
+            },
+            'daily_schedule': self.daily_schedule,
+            'booking_checklist': self.booking_checklist,
+            'total_cost': float(self.total_cost),
+            'tax_savings': float(self.tax_savings),
+            'efficiency_score': self.efficiency_score,
+            'confidence_score': self.confidence_score
+        }
 
 class TripOrchestrationIntegration:
     """
     Main integration class that coordinates all trip orchestration components
     """
     
+    # Accommodation and activity booking platforms and their features
+    accommodation_platforms: ClassVar[Dict[str, Dict[str, Any]]] = _ACCOMMODATION_PLATFORMS
+    activity_platforms: ClassVar[Dict[str, Dict[str, Any]]] = _ACTIVITY_PLATFORMS
+    
+    # Booking platform per activity category
+    _ACTIVITY_PLATFORM: ClassVar[Mapping[str, str]] = MappingProxyType({
+        'theme_park': 'direct_booking',
+        'conference': 'direct_booking',
+        'museum': 'getyourguide',
+        'tours': 'viator',
+        'attractions': 'getyourguide'
+    })
+    
+    # Estimated nightly accommodation cost per accommodation type
+    _DAILY_ACCOM_COST: ClassVar[Mapping[str, float]] = MappingProxyType({
+        'hotel': 150.0,
+        'airbnb': 120.0,
+        'family_hosting': 25.0,  # Host gift
+        'pet_friendly': 180.0,
+        'business_accommodation': 200.0
+    })
+    
+    # Typical start time per activity category
+    _ACTIVITY_TIME: ClassVar[Mapping[str, str]] = MappingProxyType({
+        'theme_park': '9:00 AM',
+        'conference': '9:00 AM',
+        'museum': '10:00 AM',
+        'dining': '7:00 PM',
+        'transport': '8:00 AM',
+        'business_meal': '7:30 PM'
+    })
+    
     def __init__(self):
         self.nlp_parser = TripNLPParser()
         self.budget_optimizer = TripBudgetOptimizer()
         self.orchestration_engine = TripOrchestrationEngine()
         
-        # Accommodation booking platforms and their features
-        self.accommodation_platforms = {
-            'airbnb': {
-                'best_for': ['families', 'extended_stays', 'kitchen_access'],
-                'avg_savings': 0.25,
-                'pet_friendly_filter': True,
-                'cancellation_flexible': True
-            },
-            'hotels.com': {
-                'best_for': ['business', 'loyalty_points', 'consistency'],
-                'avg_savings': 0.10,
-                'pet_friendly_filter': True,
-                'cancellation_flexible': False
-            },
-            'booking.com': {
-                'best_for': ['variety', 'international', 'last_minute'],
-                'avg_savings': 0.15,
-                'pet_friendly_filter': True,
-                'cancellation_flexible': True
-            }
-        }
+        # Best accommodation platform per requirements bitmask
+        self._accommodation_platform_table = self._build_accommodation_platform_table()
         
-        # Activity booking platforms
-        self.activity_platforms = {
-            'viator': {'best_for': ['tours', 'experiences'], 'discount_rate': 0.05},
-            'getyourguide': {'best_for': ['attractions', 'skip_the_line'], 'discount_rate': 0.08},
-            'klook': {'best_for': ['asia_pacific', 'theme_parks'], 'discount_rate': 0.12},
-            'direct_booking': {'best_for': ['theme_parks', 'museums'], 'discount_rate': 0.00}
-        }
+        # Budget optimization results keyed by the canonicalized optimizer inputs
+        self._budget_cache: Dict[Tuple, Dict[str, Any]] = {}
     
+    @_log_errors("Error in complete trip orchestration")
     async def orchestrate_complete_trip(self, natural_language_query: str) -> CompleteItinerary:
         """
         Main orchestration method that processes a natural language query into a complete itinerary
         """
-        try:
-            logger.info(f"Starting complete trip orchestration for: {natural_language_query}")
-            
-            # Step 1: Parse natural language query
-            parsed_request = self.nlp_parser.parse_trip_request(natural_language_query)
-            logger.info(f"NLP parsing complete. Confidence: {parsed_request['confidence']:.2f}")
-            
-            # Step 2: Optimize budget
-            budget_optimization = await self._optimize_trip_budget(parsed_request)
-            logger.info(f"Budget optimization complete. Efficiency: {budget_optimization['efficiency_score']:.2f}")
-            
-            # Step 3: Orchestrate trip components
-            orchestration_result = await self.orchestration_engine.orchestrate_trip(parsed_request)
-            logger.info(f"Trip orchestration complete. Score: {orchestration_result.optimization_score:.2f}")
-            
-            # Step 4: Generate daily schedule
-            daily_schedule = self._generate_daily_schedule(orchestration_result, parsed_request)
-            
-            # Step 5: Create booking checklist
-            booking_checklist = self._generate_booking_checklist(orchestration_result, parsed_request)
-            
-            # Step 6: Calculate final metrics
-            total_cost = sum(orchestration_result.cost_breakdown.values())
-            efficiency_score = (budget_optimization['efficiency_score'] + orchestration_result.optimization_score) / 2
-            confidence_score = parsed_request['confidence']
-            
-            # Create complete itinerary
-            complete_itinerary = CompleteItinerary(
-                trip_id=orchestration_result.trip_id,
-                original_query=natural_language_query,
-                parsed_request=parsed_request,
-                budget_optimization=budget_optimization,
-                orchestration_result=orchestration_result,
-                daily_schedule=daily_schedule,
-                booking_checklist=booking_checklist,
-                total_cost=total_cost,
-                tax_savings=orchestration_result.tax_savings,
-                efficiency_score=efficiency_score,
-                confidence_score=confidence_score
-            )
-            
-            logger.info(f"Complete trip orchestration finished. Trip ID: {complete_itinerary.trip_id}")
-            return complete_itinerary
-            
-        except Exception as e:
-            logger.error(f"Error in complete trip orchestration: {e}")
-            raise
+        logger.info("Starting complete trip orchestration for: %s", natural_language_query)
+        
+        # Step 1: Parse natural language query
+        parsed_request = await asyncio.to_thread(self.nlp_parser.parse_trip_request, natural_language_query)
+        logger.info("NLP parsing complete. Confidence: %.2f", parsed_request['confidence'])
+        
+        # Step 2: Optimize budget
+        budget_optimization = await self._optimize_trip_budget(parsed_request)
+        logger.info("Budget optimization complete. Efficiency: %.2f", budget_optimization['efficiency_score'])
+        
+        # Step 3: Orchestrate trip components
+        orchestration_result = await self.orchestration_engine.orchestrate_trip(parsed_request)
+        logger.info("Trip orchestration complete. Score: %.2f", orchestration_result.optimization_score)
+        
+        # Step 4: Generate daily schedule
+        daily_schedule = self._generate_daily_schedule(orchestration_result, parsed_request)
+        
+        # Step 5: Create booking checklist
+        booking_checklist = self._generate_booking_checklist(orchestration_result, parsed_request)
+        
+        # Step 6: Calculate final metrics
+        total_cost = sum(orchestration_result.cost_breakdown.values(), Decimal('0')).quantize(
+            Decimal('0.01'), ROUND_HALF_UP
+        )
+        efficiency_score = (budget_optimization['efficiency_score'] + orchestration_result.optimization_score) / 2
+        confidence_score = parsed_request['confidence']
+        
+        # Create complete itinerary
+        complete_itinerary = CompleteItinerary(
+            trip_id=orchestration_result.trip_id,
+            original_query=natural_language_query,
+            parsed_request=parsed_request,
+            budget_optimization=budget_optimization,
+            orchestration_result=orchestration_result,
+            daily_schedule=daily_schedule,
+            booking_checklist=booking_checklist,
+            total_cost=total_cost,
+            tax_savings=orchestration_result.tax_savings,
+            efficiency_score=efficiency_score,
+            confidence_score=confidence_score
+        )
+        
+        logger.info("Complete trip orchestration finished. Trip ID: %s", complete_itinerary.trip_id)
+        return complete_itinerary
     
     async def _optimize_trip_budget(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Optimize budget based on parsed request"""
+        """Optimize budget based on parsed request, reusing results for identical optimizer inputs"""
         budget_value = parsed_request.get('budget', 4000)
         # Handle case where budget might be parsed incorrectly or None
         if budget_value is None:
@@ -141,7 +302,7 @@ class TripOrchestrationIntegration:
         try:
             total_budget = Decimal(str(budget_value))
         except (TypeError, ValueError, decimal.InvalidOperation):
-            logger.warning(f"Invalid budget value: {budget_value}, using default $6000")
+            logger.warning("Invalid budget value: %s, using default $6000", budget_value)
             total_budget = Decimal('6000')  # Default for complex trips
         
         # Create trip parameters for budget optimizer
@@ -196,12 +357,21 @@ class TripOrchestrationIntegration:
                 flexible=False
             ))
         
+        # Reuse a previous optimization for the same inputs
+        cache_key = (
+            total_budget, _freeze(trip_params), strategy,
+            tuple((c.category, c.min_amount, c.priority, c.flexible) for c in constraints)
+        )
+        cached = self._budget_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         # Optimize budget
         optimization_result = await self.budget_optimizer.optimize_budget(
             total_budget, trip_params, constraints, strategy
         )
         
-        return {
+        budget_optimization = {
             'optimized_budget': optimization_result.optimized_budget,
             'total_cost': float(optimization_result.total_cost),
             'savings': float(optimization_result.savings),
@@ -212,66 +382,80 @@ class TripOrchestrationIntegration:
             'total_constraints': optimization_result.total_constraints,
             'alternatives': optimization_result.alternative_allocations
         }
+        
+        # Evict the oldest entry once the cache is full
+        if len(self._budget_cache) >= _BUDGET_CACHE_SIZE:
+            self._budget_cache.pop(next(iter(self._budget_cache)), None)
+        self._budget_cache[cache_key] = budget_optimization
+        
+        return dict(budget_optimization)
     
     def _generate_daily_schedule(self, orchestration_result: TripItinerary, 
                                 parsed_request: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate detailed daily schedule"""
         daily_schedule = []
         
+        # Request fields consulted for every day of the trip
+        has_pets = parsed_request.get('has_pets', False)
+        business_portion = parsed_request.get('business_portion', 0)
+        activities_set = frozenset(parsed_request.get('activities', ()))
+        budget_conscious = parsed_request.get('budget_constraints', {}).get('budget_conscious', False)
+        
         # Group activities by date
-        activities_by_date = {}
+        activities_by_date = defaultdict(list)
         for activity in orchestration_result.activities:
-            date = activity.date
-            if date not in activities_by_date:
-                activities_by_date[date] = []
-            activities_by_date[date].append(activity)
+            activities_by_date[activity.date].append(activity)
         
         # Create daily schedule for each segment
         for segment in orchestration_result.segments:
-            current_date = datetime.strptime(segment.start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(segment.end_date, '%Y-%m-%d')
+            start_ordinal = parse_ymd(segment.start_date).toordinal()
+            end_ordinal = parse_ymd(segment.end_date).toordinal()
+            request_notes, destination_notes = self._compute_segment_invariant_notes(
+                segment, has_pets, business_portion, activities_set
+            )
             
-            while current_date <= end_date:
-                date_str = current_date.strftime('%Y-%m-%d')
+            for ordinal in range(start_ordinal, end_ordinal + 1):
+                current_date = date.fromordinal(ordinal)
+                date_str = f"{current_date.year:04d}-{current_date.month:02d}-{current_date.day:02d}"
                 
                 # Create daily schedule
                 day_schedule = {
                     'date': date_str,
-                    'day_of_week': current_date.strftime('%A'),
+                    'day_of_week': _DAY_NAMES[current_date.weekday()],
                     'location': segment.destination,
                     'accommodation': {
                         'type': segment.accommodation_type.value,
                         'estimated_cost': self._estimate_daily_accommodation_cost(segment)
                     },
                     'activities': [],
-                    'meals': self._plan_daily_meals(segment, parsed_request),
-                    'transport': self._plan_daily_transport(segment, parsed_request),
+                    'meals': self._plan_daily_meals(segment, activities_set, business_portion),
+                    'transport': self._plan_daily_transport(segment, budget_conscious),
                     'estimated_daily_cost': Decimal('0'),
                     'notes': []
                 }
                 
                 # Add scheduled activities for this date
-                if date_str in activities_by_date:
-                    for activity in activities_by_date[date_str]:
-                        day_schedule['activities'].append({
-                            'name': activity.name,
-                            'time': self._estimate_activity_time(activity),
-                            'duration': f"{activity.duration_hours} hours",
-                            'cost': float(activity.cost),
-                            'booking_required': activity.booking_required,
-                            'category': activity.category
-                        })
+                for activity in activities_by_date.get(date_str, ()):
+                    day_schedule['activities'].append({
+                        'name': activity.name,
+                        'time': self._estimate_activity_time(activity),
+                        'duration': f"{activity.duration_hours} hours",
+                        'cost': float(activity.cost),
+                        'booking_required': activity.booking_required,
+                        'category': activity.category
+                    })
                 
                 # Calculate daily cost
                 day_schedule['estimated_daily_cost'] = float(
-                    self._calculate_daily_cost(day_schedule, segment, parsed_request)
+                    self._calculate_daily_cost(day_schedule, has_pets)
                 )
                 
                 # Add special notes
-                day_schedule['notes'] = self._generate_daily_notes(segment, current_date, parsed_request)
+                day_schedule['notes'] = self._generate_daily_notes(
+                    segment, current_date, date_str, request_notes, destination_notes
+                )
                 
                 daily_schedule.append(day_schedule)
-                current_date += timedelta(days=1)
         
         return daily_schedule
     
@@ -304,128 +488,97 @@ class TripOrchestrationIntegration:
         
         # Pet-related bookings
         if parsed_request.get('has_pets', False):
-            checklist.extend([
-                "🐕 Schedule vet visit for health certificate (2-3 weeks before travel)",
-                "🐕 Purchase airline-approved pet carrier",
-                "🐕 Book pet-friendly accommodations",
-                "🐕 Research pet daycare options at destination",
-                "🐕 Purchase pet travel insurance"
-            ])
+            checklist.extend(_PET_CHECKLIST)
         
         # Business-related tasks
         if parsed_request.get('business_portion', 0) > 0:
-            checklist.extend([
-                "💼 Set up expense tracking app/spreadsheet",
-                "💼 Confirm business meeting/conference details",
-                "💼 Download receipt scanning app",
-                "💼 Review company travel policy"
-            ])
+            checklist.extend(_BUSINESS_CHECKLIST)
         
         # General travel preparation
-        checklist.extend([
-            "📱 Download airline apps",
-            "📱 Download accommodation apps",
-            "💳 Notify credit card companies of travel",
-            "🧳 Check baggage allowances",
-            "📋 Create packing checklist",
-            "🌐 Check international roaming/SIM options",
-            "💉 Check vaccination requirements (if international)"
-        ])
+        checklist.extend(_GENERAL_CHECKLIST)
         
         # Family-specific items
         if parsed_request.get('passenger_count', 1) > 2:
-            checklist.extend([
-                "👨‍👩‍👧‍👦 Prepare travel entertainment for family",
-                "👨‍👩‍👧‍👦 Pack snacks and travel essentials",
-                "👨‍👩‍👧‍👦 Confirm child policies for activities"
-            ])
+            checklist.extend(_FAMILY_CHECKLIST)
         
         return checklist
     
     def _estimate_daily_accommodation_cost(self, segment) -> float:
         """Estimate daily accommodation cost"""
-        base_costs = {
-            'hotel': 150,
-            'airbnb': 120,
-            'family_hosting': 25,  # Host gift
-            'pet_friendly': 180,
-            'business_accommodation': 200
-        }
-        
-        return base_costs.get(segment.accommodation_type.value, 120)
+        return self._DAILY_ACCOM_COST.get(segment.accommodation_type.value, 120.0)
     
-    def _plan_daily_meals(self, segment, parsed_request: Dict[str, Any]) -> List[Dict[str, str]]:
+    def _plan_daily_meals(self, segment, activities_set: frozenset, business_portion: float) -> List[Dict[str, Any]]:
         """Plan daily meals"""
         meals = []
         
         # Breakfast
         if segment.accommodation_type.value in ['airbnb', 'family_hosting']:
-            meals.append({'meal': 'Breakfast', 'plan': 'Cook at accommodation', 'estimated_cost': '15'})
+            meals.append({'meal': 'Breakfast', 'plan': 'Cook at accommodation', 'estimated_cost': 15.0})
         else:
-            meals.append({'meal': 'Breakfast', 'plan': 'Hotel breakfast or local cafe', 'estimated_cost': '25'})
+            meals.append({'meal': 'Breakfast', 'plan': 'Hotel breakfast or local cafe', 'estimated_cost': 25.0})
         
         # Lunch
-        if 'theme_park' in parsed_request.get('activities', []):
-            meals.append({'meal': 'Lunch', 'plan': 'Theme park dining', 'estimated_cost': '45'})
+        if 'theme_park' in activities_set:
+            meals.append({'meal': 'Lunch', 'plan': 'Theme park dining', 'estimated_cost': 45.0})
         else:
-            meals.append({'meal': 'Lunch', 'plan': 'Local restaurant', 'estimated_cost': '35'})
+            meals.append({'meal': 'Lunch', 'plan': 'Local restaurant', 'estimated_cost': 35.0})
         
         # Dinner
-        if parsed_request.get('business_portion', 0) > 0:
-            meals.append({'meal': 'Dinner', 'plan': 'Business dinner', 'estimated_cost': '80'})
+        if business_portion > 0:
+            meals.append({'meal': 'Dinner', 'plan': 'Business dinner', 'estimated_cost': 80.0})
         else:
-            meals.append({'meal': 'Dinner', 'plan': 'Family restaurant', 'estimated_cost': '60'})
+            meals.append({'meal': 'Dinner', 'plan': 'Family restaurant', 'estimated_cost': 60.0})
         
         return meals
     
-    def _plan_daily_transport(self, segment, parsed_request: Dict[str, Any]) -> Dict[str, str]:
+    def _plan_daily_transport(self, segment, budget_conscious: bool) -> Dict[str, Any]:
         """Plan daily transportation"""
         if segment.accommodation_type.value == 'family_hosting':
-            return {'method': 'Family transport/rideshare', 'estimated_cost': '25'}
-        elif parsed_request.get('budget_constraints', {}).get('budget_conscious', False):
-            return {'method': 'Public transport', 'estimated_cost': '15'}
+            return {'method': 'Family transport/rideshare', 'estimated_cost': 25.0}
+        elif budget_conscious:
+            return {'method': 'Public transport', 'estimated_cost': 15.0}
         else:
-            return {'method': 'Rental car/rideshare', 'estimated_cost': '45'}
+            return {'method': 'Rental car/rideshare', 'estimated_cost': 45.0}
     
     def _estimate_activity_time(self, activity) -> str:
         """Estimate activity start time"""
         # Simple time estimation based on activity type
-        time_mapping = {
-            'theme_park': '9:00 AM',
-            'conference': '9:00 AM',
-            'museum': '10:00 AM',
-            'dining': '7:00 PM',
-            'transport': '8:00 AM',
-            'business_meal': '7:30 PM'
-        }
-        
-        return time_mapping.get(activity.category, '10:00 AM')
+        return self._ACTIVITY_TIME.get(activity.category, '10:00 AM')
     
-    def _calculate_daily_cost(self, day_schedule: Dict[str, Any], segment, parsed_request: Dict[str, Any]) -> Decimal:
+    def _calculate_daily_cost(self, day_schedule: Dict[str, Any], has_pets: bool) -> Decimal:
         """Calculate estimated daily cost"""
-        total_cost = Decimal('0')
-        
-        # Accommodation cost
-        total_cost += Decimal(str(day_schedule['accommodation']['estimated_cost']))
+        total_cost = _daily_cost_kernel(
+            day_schedule['accommodation']['estimated_cost'],
+            (activity['cost'] for activity in day_schedule['activities']),
+            (meal['estimated_cost'] for meal in day_schedule['meals']),
+            day_schedule['transport']['estimated_cost'],
+            20.0 if has_pets else 0.0  # Daily pet costs
+        )
         
-        # Activity costs
-        for activity in day_schedule['activities']:
-            total_cost += Decimal(str(activity['cost']))
+        return Decimal(format(total_cost, '.2f'))
+    
+    def _compute_segment_invariant_notes(self, segment, has_pets: bool, business_portion: float,
+                                         activities_set: frozenset) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Compute the daily notes that hold for every day of a segment"""
+        request_notes = []
         
-        # Meal costs
-        for meal in day_schedule['meals']:
-            total_cost += Decimal(str(meal['estimated_cost']))
+        # Pet notes
+        if has_pets:
+            request_notes.append("Remember to plan for pet needs and restrictions")
         
-        # Transport cost
-        total_cost += Decimal(str(day_schedule['transport']['estimated_cost']))
+        # Business notes
+        if business_portion > 0:
+            request_notes.append("Keep all receipts for business expense tracking")
         
-        # Pet costs (if applicable)
-        if parsed_request.get('has_pets', False):
-            total_cost += Decimal('20')  # Daily pet costs
+        # Destination-specific notes
+        destination_notes = []
+        if segment.destination == 'LAX' and 'theme_park' in activities_set:
+            destination_notes.append("Download Disneyland app for wait times and mobile ordering")
         
-        return total_cost
+        return tuple(request_notes), tuple(destination_notes)
     
-    def _generate_daily_notes(self, segment, current_date: datetime, parsed_request: Dict[str, Any]) -> List[str]:
+    def _generate_daily_notes(self, segment, current_date: date, date_str: str,
+                              request_notes: Tuple[str, ...], destination_notes: Tuple[str, ...]) -> List[str]:
         """Generate helpful daily notes"""
         notes = []
         
@@ -433,41 +586,48 @@ class TripOrchestrationIntegration:
         if current_date.weekday() >= 5:  # Saturday or Sunday
             notes.append("Weekend - expect higher prices and crowds")
         
-        # Pet notes
-        if parsed_request.get('has_pets', False):
-            notes.append("Remember to plan for pet needs and restrictions")
-        
-        # Business notes
-        if parsed_request.get('business_portion', 0) > 0:
-            notes.append("Keep all receipts for business expense tracking")
+        notes.extend(request_notes)
         
         # First day notes
-        if current_date.strftime('%Y-%m-%d') == segment.start_date:
+        if date_str == segment.start_date:
             notes.append("Arrival day - plan for potential travel fatigue")
         
-        # Destination-specific notes
-        if segment.destination == 'LAX' and 'theme_park' in parsed_request.get('activities', []):
-            notes.append("Download Disneyland app for wait times and mobile ordering")
+        notes.extend(destination_notes)
         
         return notes
     
     def _recommend_accommodation_platform(self, segment, parsed_request: Dict[str, Any]) -> str:
         """Recommend best accommodation booking platform"""
-        requirements = []
+        mask = 0
         
         if parsed_request.get('has_pets', False):
-            requirements.append('pet_friendly_filter')
+            mask |= 1 << 0
         
         if parsed_request.get('business_portion', 0) > 0:
-            requirements.append('business')
+            mask |= 1 << 1
         
         if parsed_request.get('passenger_count', 1) > 2:
-            requirements.append('families')
+            mask |= 1 << 2
         
         if parsed_request.get('duration_days', 0) > 7:
-            requirements.append('extended_stays')
+            mask |= 1 << 3
+        
+        return self._accommodation_platform_table[mask]
+    
+    def _build_accommodation_platform_table(self) -> Dict[int, str]:
+        """Precompute the best accommodation platform for every combination of requirements"""
+        # Bit order matches the mask built in _recommend_accommodation_platform
+        requirement_flags = ('pet_friendly_filter', 'business', 'families', 'extended_stays')
         
-        # Score platforms based on requirements
+        table = {}
+        for mask in range(1 << len(requirement_flags)):
+            requirements = [flag for bit, flag in enumerate(requirement_flags) if mask & (1 << bit)]
+            table[mask] = self._score_accommodation_platforms(requirements)
+        
+        return table
+    
+    def _score_accommodation_platforms(self, requirements: List[str]) -> str:
+        """Score accommodation platforms against requirements and return the best one"""
         platform_scores = {}
         for platform, features in self.accommodation_platforms.items():
             score = 0
@@ -488,21 +648,19 @@ class TripOrchestrationIntegration:
     
     def _recommend_activity_platform(self, activity) -> str:
         """Recommend best activity booking platform"""
-        category_mapping = {
-            'theme_park': 'direct_booking',
-            'conference': 'direct_booking',
-            'museum': 'getyourguide',
-            'tours': 'viator',
-            'attractions': 'getyourguide'
-        }
-        
-        return category_mapping.get(activity.category, 'viator')
+        return self._ACTIVITY_PLATFORM.get(activity.category, 'viator')
+
+
+@lru_cache(maxsize=1)
+def get_integration() -> TripOrchestrationIntegration:
+    """Return the process-wide integration so the NLP model and engines are loaded once"""
+    return TripOrchestrationIntegration()
 
 
 # Test the integration
 async def test_integration():
     """Test the complete integration"""
-    integration = TripOrchestrationIntegration()
+    integration = get_integration()
     
     # Test scenarios
     test_scenarios = [
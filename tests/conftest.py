@@ -0,0 +1,40 @@
+"""
+Shared pytest fixtures for the FlightPath test suite
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# The application modules import each other flat from src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def ai_flightpath():
+    """One AIFlightPath (and Anthropic client) shared by the whole run."""
+    # Imported here so tests that don't use Claude don't need its dependencies;
+    # the import also loads .env, so check the key afterwards
+    from ai_flightpath import AIFlightPath
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        pytest.skip("ANTHROPIC_API_KEY not set")
+    return await asyncio.to_thread(AIFlightPath)
+
+
+@pytest.fixture(scope="session")
+def query_parser():
+    """One FlightQueryParser so the spaCy model loads once per run."""
+    from nlp_parser import FlightQueryParser
+    return FlightQueryParser()
+
+
+@pytest.fixture(scope="session")
+def context_engine():
+    """One ContextEngine so its context cache is shared across tests."""
+    # Importing context_engine installs a process-wide requests cache
+    from context_engine import ContextEngine
+    return ContextEngine()
@@ -0,0 +1,27 @@
+"""
+Phase timing for the FlightPath test scripts
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Collect per-phase durations and report them on a single line."""
+
+    def __init__(self):
+        self.timings_ns = {}
+
+    @contextmanager
+    def timed(self, label):
+        """Time the enclosed block under label."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.timings_ns[label] = time.perf_counter_ns() - start
+
+    def summary(self):
+        """Format all recorded phases as one summary line."""
+        phases = " | ".join(f"{label}: {ns / 1e6:.1f} ms" for label, ns in self.timings_ns.items())
+        return f"⏱️  {phases}"
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for business tax benefits in the trip orchestration engine
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from trip_orchestration_engine import TripOrchestrationEngine
+
+pytestmark = pytest.mark.asyncio
+
+# Multi-city trip with a business conference, so every segment is business
+BUSINESS_TRIP = {
+    'original_query': 'LA and SF for 2 weeks, sister hosting, bring dog, music conference',
+    'budget': 6000,
+    'passenger_count': 1,
+    'origin': 'JFK',
+    'destinations': ['LAX', 'SFO'],
+    'purposes': ['family visit', 'business conference'],
+    'duration_days': 14,
+    'start_date': '2024-09-01',
+    'flexible_dates': True,
+    'has_pets': True,
+    'has_business': True
+}
+
+async def test_tax_benefits_include_business_segment_share():
+    """Business segments add half of accommodation and transport to the deductions."""
+    engine = TripOrchestrationEngine()
+    itinerary = await engine.orchestrate_trip(BUSINESS_TRIP)
+    budget = itinerary.budget
+
+    assert all(segment.is_business for segment in itinerary.segments)
+
+    # The same activities and budget without any business segment
+    activities_only_savings, activities_only_percentage = engine._calculate_tax_benefits(
+        itinerary.activities, itinerary.requirements, budget, []
+    )
+
+    # Half of accommodation and transport, both fully deductible, at the 25% tax rate
+    business_share = (budget.accommodation_budget + budget.transport_budget) * Decimal('0.5')
+    assert business_share > 0
+    assert itinerary.tax_savings == activities_only_savings + business_share * Decimal('0.25')
+    assert itinerary.business_percentage == pytest.approx(
+        activities_only_percentage + float(business_share / budget.total_budget * 100)
+    )